@@ -1,21 +1,83 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_request_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from jinja2 import Environment, select_autoescape
 import mysql.connector
+import mysql.connector.pooling
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
 
+try:
+    import orjson  # optional: faster JSON for the big report bundles
+except ImportError:
+    orjson = None
+
 # ---- DB config ----
 DB_HOST = "localhost"
 DB_PORT = 3306
 DB_USER = "root"
 DB_PASS = ""           # set if you have a password
 DB_NAME = "tamankota"
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_POOL_WAIT = float(os.environ.get("DB_POOL_WAIT", 0.5))  # seconds to wait for a free pooled conn
+
+DB_CONFIG = dict(
+    host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASS, database=DB_NAME,
+    autocommit=False,
+    # C extension for protocol/row decoding when it is installed, pure Python otherwise
+    # (an explicit use_pure=False would make a missing extension a hard ImportError)
+    use_pure=not mysql.connector.HAVE_CEXT,
+    # drain leftover rows when a streaming cursor (rows_iter) is closed early
+    consume_results=True,
+)
+
+# One pool per process; conn.close() hands the connection back instead of dropping it.
+# Created on first use: the constructor opens every connection, and importing the
+# app (wsgi.py, /api/health) must not fail just because MySQL is down.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def _pool():
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:  # a failed attempt leaves it None, so the next call retries
+                _POOL = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="tamankota", pool_size=DB_POOL_SIZE, pool_reset_session=False, **DB_CONFIG,
+                )
+    return _POOL
 
 def get_conn():
-    return mysql.connector.connect(
-        host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASS, database=DB_NAME
-    )
+    """
+    A pooled connection. get_connection() doesn't block when all are checked out
+    (it raises PoolError), so wait up to DB_POOL_WAIT for one to come back, then
+    open an unpooled overflow connection (closed for real by conn.close()).
+    """
+    pool = _pool()
+    deadline = time.monotonic() + DB_POOL_WAIT
+    while True:
+        try:
+            return pool.get_connection()
+        except mysql.connector.errors.PoolError:
+            if time.monotonic() >= deadline:
+                return mysql.connector.connect(**DB_CONFIG)
+            time.sleep(0.005)
+
+class OrJSONProvider(DefaultJSONProvider):
+    """jsonify()/dict responses serialized by orjson; unknown types go through Flask's default()."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrJSONProvider(app)
 # Allow Apache (127.0.0.1:8081 or localhost:8081) to call this API
 CORS(
     app,
@@ -25,15 +87,83 @@ CORS(
     allow_headers=["Content-Type"]
 )
 
+def release_conn(conn):
+    """
+    End the read snapshot and give conn back to the pool. close() runs even if
+    the rollback fails (lost connection): the pool reconnects it on next checkout.
+    """
+    try:
+        conn.rollback()
+    finally:
+        conn.close()
+
+# ---- Request-scoped connection for the report endpoints ----
+# All reads of one /api/report/* request share a single pooled connection, checked
+# out by _read_conn on first use (so CORS preflights and fully cached requests
+# never take one). rows_iter still takes its own: a streamed body outlives
+# teardown_request.
+def _request_conn():
+    if not has_request_context() or request.method == "OPTIONS" \
+            or not request.path.startswith("/api/report/"):
+        return None
+    conn = g.get("conn")
+    if conn is None:
+        conn = g.conn = get_conn()
+    return conn
+
+@app.teardown_request
+def _close_request_conn(exc=None):
+    conn = g.pop("conn", None)
+    if conn is not None:
+        release_conn(conn)
+
 # ---- Helpers ----
-def rows(query, params=None):
+@contextmanager
+def _read_conn():
+    """Yield the request's shared conn (report endpoints), else a pooled conn that is returned on exit."""
+    conn = _request_conn()
+    if conn is not None:
+        yield conn
+        return
     conn = get_conn()
     try:
+        yield conn
+    finally:
+        # end the read snapshot so the next checkout of this pooled conn sees fresh data
+        release_conn(conn)
+
+def rows(query, params=None):
+    with _read_conn() as conn:
         with conn.cursor(dictionary=True) as cur:
             cur.execute(query, params or ())
             return cur.fetchall()
+
+def rows_many(queries_params):
+    """Run several (query, params) pairs on ONE connection; returns a list of result sets."""
+    out = []
+    with _read_conn() as conn:
+        with conn.cursor(dictionary=True) as cur:
+            for query, params in queries_params:
+                cur.execute(query, params or ())
+                out.append(cur.fetchall())
+    return out
+
+def rows_iter(query, params=None, batch=1000):
+    """
+    Yield rows in fetchmany(batch) chunks instead of materializing them all.
+    Lazy: the pooled connection is taken on first next() and held until exhausted/closed.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(query, params or ())
+            while True:
+                chunk = cur.fetchmany(batch)
+                if not chunk:
+                    break
+                yield from chunk
     finally:
-        conn.close()
+        release_conn(conn)
 
 def execute(query, params=None):
     conn = get_conn()
@@ -42,9 +172,203 @@ def execute(query, params=None):
             cur.execute(query, params or ())
             conn.commit()
             return cur.lastrowid
+    except Exception:
+        # pooled sessions aren't reset: don't hand one back mid-transaction (locks held)
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def execute_many(query, seq_params, batch=1000):
+    """
+    executemany() in one transaction; returns the total rowcount.
+    Sent in slices of `batch` rows so each multi-row INSERT stays under max_allowed_packet.
+    """
+    conn = get_conn()
+    try:
+        total = 0
+        with conn.cursor() as cur:
+            for i in range(0, len(seq_params), batch):
+                cur.executemany(query, seq_params[i:i + batch])
+                total += cur.rowcount
+            conn.commit()
+            return total
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+# ---- Prepared statements, cached per pooled connection ----
+# Each (connection, query) keeps one open cursor(prepared=True): the statement is
+# PREPAREd once per connection and afterwards only EXECUTEd (closing the cursor
+# would send COM_STMT_CLOSE and throw the server-side statement away).
+# Relies on pool_reset_session=False (a session reset deallocates statements);
+# a reconnect shows up as a new connection_id and drops that connection's cache.
+_PREPARED = weakref.WeakKeyDictionary()  # raw connection -> (connection_id, {(query, dictionary): cursor})
+
+@contextmanager
+def _prepared_cursor(conn, query, dictionary=False):
+    raw = getattr(conn, "_cnx", None)  # the real connection behind the PooledMySQLConnection wrapper
+    if raw is None:
+        # overflow connection (see get_conn): closed after this request, nothing to cache
+        with conn.cursor(prepared=True, dictionary=dictionary) as cur:
+            yield cur
+        return
+    entry = _PREPARED.get(raw)
+    if entry is None or entry[0] != raw.connection_id:
+        entry = _PREPARED[raw] = (raw.connection_id, {})
+    key = (query, dictionary)
+    cur = entry[1].get(key)
+    if cur is None:
+        cur = entry[1][key] = conn.cursor(prepared=True, dictionary=dictionary)
+    try:
+        yield cur
+    except Exception:
+        # don't keep a cursor in an unknown state around
+        entry[1].pop(key, None)
+        try:
+            cur.close()
+        except Exception:
+            pass
+        raise
+
+def rows_prepared(query, params=None):
+    """Like rows(), but over the binary prepared-statement protocol (hot CRUD paths)."""
+    conn = get_conn()
+    try:
+        with _prepared_cursor(conn, query, dictionary=True) as cur:
+            cur.execute(query, params or ())
+            return cur.fetchall()
+    finally:
+        release_conn(conn)
+
+def execute_prepared(query, params=None):
+    conn = get_conn()
+    try:
+        with _prepared_cursor(conn, query) as cur:
+            cur.execute(query, params or ())
+            conn.commit()
+            return cur.lastrowid
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+# ---- Small lookup tables: in-process TTL cache ----
+# taman/petugas/kegiatan change rarely but are re-read by every list call and report.
+# Cleared by this process's create_* / clear_all; CACHE_TTL bounds staleness elsewhere.
+CACHE_TTL = 30
+_CACHE = {}  # key -> (expires_at, rows)
+
+def cached_rows(key, query):
+    hit = _CACHE.get(key)
+    now = time.monotonic()
+    if hit and hit[0] > now:
+        return hit[1]
+    data = rows(query)
+    _CACHE[key] = (now + CACHE_TTL, data)
+    return data
+
+def clear_cache():
+    _CACHE.clear()
+
+def get_taman():
+    return cached_rows("taman", "SELECT id_taman, nama_taman, luas_taman, lokasi FROM taman ORDER BY nama_taman")
+
+def get_petugas():
+    return cached_rows("petugas", "SELECT id_petugas, nama_petugas, jabatan FROM petugas ORDER BY nama_petugas")
+
+def get_kegiatan():
+    return cached_rows("kegiatan", "SELECT id_kegiatan, jenis_kegiatan FROM kegiatan ORDER BY jenis_kegiatan")
+
+# ---- Create endpoints for the master tables, generated from SCHEMAS ----
+# field spec: (name, required, type); int fields are coerced, str fields pass through as sent
+SCHEMAS = {
+    "taman":    (("nama_taman", True, str), ("luas_taman", False, int), ("lokasi", False, str)),
+    "petugas":  (("nama_petugas", True, str), ("jabatan", False, str)),
+    "kegiatan": (("jenis_kegiatan", True, str),),
+    "tanaman":  (("id_taman", True, int), ("nama_umum", True, str),
+                 ("nama_ilmiah", False, str), ("jenis", False, str)),
+}
+
+def insert_sql(table):
+    schema = SCHEMAS[table]
+    return (f"INSERT INTO {table} ({', '.join(name for name, _, _ in schema)}) "
+            f"VALUES ({', '.join(['%s'] * len(schema))})")
+
+def make_validator(table):
+    """
+    Return validate(payload) -> (params, None) or (None, error message) for `table`.
+    Field order and error messages are precomputed; a call only walks a flat tuple.
+    """
+    fields = tuple(
+        (name, required, typ is int,
+         f"{name} is required (int)" if typ is int else f"{name} is required")
+        for name, required, typ in SCHEMAS[table]
+    )
+
+    def validate(payload):
+        params = []
+        for name, required, as_int, err in fields:
+            v = payload.get(name)
+            if as_int:
+                if v in (None, "") and not required:
+                    v = None
+                else:
+                    try:
+                        v = int(v)
+                    except (TypeError, ValueError):
+                        return None, (err if required else f"{name} must be an int")
+            elif required and not v:
+                return None, err
+            params.append(v)
+        return tuple(params), None
+
+    return validate
+
+def make_create_handler(table, run, clear=False):
+    """
+    Build the POST handler for `table` once at import.
+    run: execute / execute_prepared; clear: drop the lookup cache after insert.
+    """
+    sql = insert_sql(table)
+    validate = make_validator(table)
+    pk = f"id_{table}"
+
+    def handler():
+        params, err = validate(request.get_json(force=True))
+        if err:
+            return {"error": err}, 400
+        try:
+            new_id = run(sql, params)
+        except mysql.connector.Error as e:
+            return {"error": str(e)}, 400
+        if clear:
+            clear_cache()
+        return {pk: new_id}, 201
+
+    handler.__name__ = f"create_{table}"
+    return handler
+
+def bulk_params(validate):
+    """
+    Read {"items": [...]} from the request and validate every item.
+    Returns (list of param tuples, None) or (None, (error body, status)).
+    """
+    payload = request.get_json(force=True, silent=True) or {}
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, ({"error": "items must be a non-empty list"}, 400)
+    out = []
+    for i, item in enumerate(items):
+        params, err = validate(item) if isinstance(item, dict) else (None, "must be an object")
+        if err:
+            return None, ({"error": f"items[{i}]: {err}"}, 400)
+        out.append(params)
+    return out, None
+
 # ---- Health ----
 @app.get("/api/health")
 def health():
@@ -57,61 +381,23 @@ def health():
 # ---- Taman ----
 @app.get("/api/taman")
 def list_taman():
-    data = rows("""SELECT id_taman, nama_taman, luas_taman, lokasi
-                   FROM taman ORDER BY nama_taman ASC""")
-    return jsonify(data)
+    return jsonify(get_taman())
 
-@app.post("/api/taman")
-def create_taman():
-    payload = request.get_json(force=True)
-    nama = payload.get("nama_taman")
-    luas = payload.get("luas_taman")
-    lokasi = payload.get("lokasi")
-    if not nama:
-        return {"error": "nama_taman is required"}, 400
-    try:
-        new_id = execute(
-            "INSERT INTO taman (nama_taman, luas_taman, lokasi) VALUES (%s, %s, %s)",
-            (nama, int(luas) if luas not in (None, "") else None, lokasi),
-        )
-        return {"id_taman": new_id}, 201
-    except mysql.connector.Error as e:
-        return {"error": str(e)}, 400
+create_taman = app.post("/api/taman")(make_create_handler("taman", execute_prepared, clear=True))
 
 # ---- Petugas ----
 @app.get("/api/petugas")
 def list_petugas():
-    return jsonify(rows("SELECT id_petugas, nama_petugas, jabatan FROM petugas ORDER BY nama_petugas"))
-
-@app.post("/api/petugas")
-def create_petugas():
-    payload = request.get_json(force=True)
-    nama = payload.get("nama_petugas")
-    jabatan = payload.get("jabatan")
-    if not nama:
-        return {"error": "nama_petugas is required"}, 400
-    try:
-        new_id = execute("INSERT INTO petugas (nama_petugas, jabatan) VALUES (%s, %s)", (nama, jabatan))
-        return {"id_petugas": new_id}, 201
-    except mysql.connector.Error as e:
-        return {"error": str(e)}, 400
+    return jsonify(get_petugas())
+
+create_petugas = app.post("/api/petugas")(make_create_handler("petugas", execute, clear=True))
 
 # ---- Kegiatan ----
 @app.get("/api/kegiatan")
 def list_kegiatan():
-    return jsonify(rows("SELECT id_kegiatan, jenis_kegiatan FROM kegiatan ORDER BY jenis_kegiatan"))
-
-@app.post("/api/kegiatan")
-def create_kegiatan():
-    payload = request.get_json(force=True)
-    jenis = payload.get("jenis_kegiatan")
-    if not jenis:
-        return {"error": "jenis_kegiatan is required"}, 400
-    try:
-        new_id = execute("INSERT INTO kegiatan (jenis_kegiatan) VALUES (%s)", (jenis,))
-        return {"id_kegiatan": new_id}, 201
-    except mysql.connector.Error as e:
-        return {"error": str(e)}, 400
+    return jsonify(get_kegiatan())
+
+create_kegiatan = app.post("/api/kegiatan")(make_create_handler("kegiatan", execute, clear=True))
 
 # ---- Tanaman ----
 @app.get("/api/tanaman")
@@ -119,29 +405,23 @@ def list_tanaman():
     id_taman = request.args.get("id_taman", type=int)
     if not id_taman:
         return {"error": "id_taman query param is required"}, 400
-    data = rows("""SELECT id_tanaman, id_taman, nama_umum, nama_ilmiah, jenis
+    data = rows_prepared("""SELECT id_tanaman, id_taman, nama_umum, nama_ilmiah, jenis
                    FROM tanaman WHERE id_taman = %s ORDER BY id_tanaman DESC""",
                 (id_taman,))
     return jsonify(data)
 
-@app.post("/api/tanaman")
-def create_tanaman():
-    payload = request.get_json(force=True)
-    try:
-        id_taman = int(payload["id_taman"])
-    except Exception:
-        return {"error": "id_taman is required (int)"}, 400
-    nama_umum   = payload.get("nama_umum")
-    nama_ilmiah = payload.get("nama_ilmiah")
-    jenis       = payload.get("jenis")
-    if not nama_umum:
-        return {"error": "nama_umum is required"}, 400
+create_tanaman = app.post("/api/tanaman")(make_create_handler("tanaman", execute_prepared))
+
+_validate_tanaman = make_validator("tanaman")
+
+@app.post("/api/tanaman/bulk")
+def create_tanaman_bulk():
+    """Body: {"items": [{id_taman, nama_umum, nama_ilmiah?, jenis?}, ...]} -> one INSERT, one commit."""
+    params, err = bulk_params(_validate_tanaman)
+    if err:
+        return err
     try:
-        new_id = execute(
-            "INSERT INTO tanaman (id_taman, nama_umum, nama_ilmiah, jenis) VALUES (%s, %s, %s, %s)",
-            (id_taman, nama_umum, nama_ilmiah, jenis)
-        )
-        return {"id_tanaman": new_id}, 201
+        return {"inserted": execute_many(insert_sql("tanaman"), params)}, 201
     except mysql.connector.Error as e:
         return {"error": str(e)}, 400
 
@@ -149,8 +429,11 @@ def create_tanaman():
 @app.get("/api/laporan")
 def list_laporan():
     limit = request.args.get("limit", default=20, type=int)
-    data = rows("""
-        SELECT l.id_laporan, l.id_tanaman, l.id_petugas, l.id_kegiatan, l.tanggal, l.isi_laporan,
+    # the connector replaces every "%s" with a parameter (no %-formatting, "%%" is
+    # sent as-is), so the format uses single "%" and %S (not %s) for seconds
+    data = rows_prepared("""
+        SELECT l.id_laporan, l.id_tanaman, l.id_petugas, l.id_kegiatan,
+               DATE_FORMAT(l.tanggal, '%Y-%m-%d %H:%i:%S') AS tanggal, l.isi_laporan,
                t.nama_umum AS tanaman, p.nama_petugas AS petugas, k.jenis_kegiatan AS kegiatan
         FROM laporan l
         JOIN tanaman t   ON t.id_tanaman = l.id_tanaman
@@ -159,181 +442,160 @@ def list_laporan():
         ORDER BY l.tanggal DESC
         LIMIT %s
     """, (limit,))
-    for r in data:
-        if isinstance(r["tanggal"], datetime):
-            r["tanggal"] = r["tanggal"].isoformat(sep=" ", timespec="seconds")
     return jsonify(data)
 
-@app.post("/api/laporan")
-def create_laporan():
-    payload = request.get_json(force=True)
+# tanggal falls back to the DB server's NOW() when not given
+INSERT_LAPORAN = ("INSERT INTO laporan (id_tanaman, id_petugas, id_kegiatan, tanggal, isi_laporan) "
+                  "VALUES (%s, %s, %s, COALESCE(%s, NOW()), %s)")
+
+def laporan_params(payload):
+    """Return (params for INSERT_LAPORAN, None) or (None, error message)."""
     try:
         id_tanaman  = int(payload["id_tanaman"])
         id_petugas  = int(payload["id_petugas"])
         id_kegiatan = int(payload["id_kegiatan"])
     except Exception:
-        return {"error": "id_tanaman, id_petugas, id_kegiatan are required (ints)"}, 400
-
-    tanggal = payload.get("tanggal")
+        return None, "id_tanaman, id_petugas, id_kegiatan are required (ints)"
+    tanggal = payload.get("tanggal") or None
     isi     = payload.get("isi_laporan", "")
+    return (id_tanaman, id_petugas, id_kegiatan, tanggal, isi), None
 
-    if not tanggal:
-        q = """INSERT INTO laporan (id_tanaman, id_petugas, id_kegiatan, tanggal, isi_laporan)
-               VALUES (%s, %s, %s, NOW(), %s)"""
-        params = (id_tanaman, id_petugas, id_kegiatan, isi)
-    else:
-        q = """INSERT INTO laporan (id_tanaman, id_petugas, id_kegiatan, tanggal, isi_laporan)
-               VALUES (%s, %s, %s, %s, %s)"""
-        params = (id_tanaman, id_petugas, id_kegiatan, tanggal, isi)
-
+@app.post("/api/laporan")
+def create_laporan():
+    params, err = laporan_params(request.get_json(force=True))
+    if err:
+        return {"error": err}, 400
     try:
-        new_id = execute(q, params)
+        new_id = execute_prepared(INSERT_LAPORAN, params)
         return {"id_laporan": new_id}, 201
     except mysql.connector.Error as e:
         return {"error": str(e)}, 400
 
+@app.post("/api/laporan/bulk")
+def create_laporan_bulk():
+    """Body: {"items": [{id_tanaman, id_petugas, id_kegiatan, tanggal?, isi_laporan?}, ...]}."""
+    params, err = bulk_params(laporan_params)
+    if err:
+        return err
+    try:
+        return {"inserted": execute_many(INSERT_LAPORAN, params)}, 201
+    except mysql.connector.Error as e:
+        return {"error": str(e)}, 400
+
 
 # ============================================================
 # NEW: Report helpers and routes (added without changing above)
 # ============================================================
 
-def _fmt_date(v):
-    return v.isoformat(sep=" ", timespec="seconds") if isinstance(v, datetime) else v
-
-def _escape_html(s):
-    s = "" if s is None else str(s)
-    return (s.replace("&", "&amp;")
-             .replace("<", "&lt;")
-             .replace(">", "&gt;")
-             .replace('"', "&quot;")
-             .replace("'", "&#39;"))
-
-def _build_table(headers, rows_):
-    thead = "<thead><tr>" + "".join(f"<th>{_escape_html(h)}</th>" for h in headers) + "</tr></thead>"
-    tbody_rows = []
-    for r in rows_:
-        tds = "".join(f"<td>{_escape_html(c)}</td>" for c in r)
-        tbody_rows.append(f"<tr>{tds}</tr>")
-    tbody = "<tbody>" + "".join(tbody_rows) + "</tbody>"
-    return f"<table>{thead}{tbody}</table>"
-
-def _build_report_html(bundle):
-    taman    = bundle.get("taman")    or []
-    petugas  = bundle.get("petugas")  or []
-    kegiatan = bundle.get("kegiatan") or []
-    tanaman_ = bundle.get("tanaman")  or []
-    laporan  = bundle.get("laporan")  or []
-
-    # maps
-    map_taman_name_by_id = {int(t["id_taman"]): t["nama_taman"] for t in taman if t.get("id_taman") is not None}
-    map_taman_name_by_tanaman_id = {}
-    for x in tanaman_:
-        try:
-            id_tanaman = int(x.get("id_tanaman"))
-            id_taman = int(x.get("id_taman")) if x.get("id_taman") is not None else None
-            if id_tanaman is not None and id_taman is not None:
-                map_taman_name_by_tanaman_id[id_tanaman] = map_taman_name_by_id.get(id_taman, "-")
-        except Exception:
-            pass
-    map_tanaman_by_name = {str(x.get("nama_umum","")).lower(): x for x in tanaman_}
-
-    # sections
-    sec1 = _build_table(
-        ["No.", "Nama", "Luas (m²)", "Lokasi"],
-        [[i+1, t.get("nama_taman",""), t.get("luas_taman","-"), t.get("lokasi","-")] for i, t in enumerate(taman)]
-    )
-
-    sec2 = _build_table(
-        ["No.", "Nama Petugas", "Jabatan"],
-        [[i+1, p.get("nama_petugas",""), p.get("jabatan","-")] for i, p in enumerate(petugas)]
-    )
-
-    sec3 = _build_table(
-        ["No.", "Jenis Kegiatan"],
-        [[i+1, k.get("jenis_kegiatan","")] for i, k in enumerate(kegiatan)]
-    )
-
-    sec4 = _build_table(
-        ["No.", "Nama Taman", "Nama Tanaman", "Nama Ilmiah", "Jenis"],
-        [[
-            i+1,
-            map_taman_name_by_id.get(int(x.get("id_taman") or 0), "-"),
-            x.get("nama_umum",""),
-            x.get("nama_ilmiah","-"),
-            x.get("jenis","-")
-        ] for i, x in enumerate(tanaman_)]
-    )
-
-    rows5 = []
-    for i, L in enumerate(laporan):
-        nama_taman = "-"
-        try:
-            if L.get("id_tanaman") is not None:
-                nama_taman = map_taman_name_by_tanaman_id.get(int(L["id_tanaman"]), "-")
-            elif L.get("tanaman"):
-                t_ = map_tanaman_by_name.get(str(L["tanaman"]).lower())
-                if t_ and t_.get("id_taman") is not None:
-                    nama_taman = map_taman_name_by_id.get(int(t_["id_taman"]), "-")
-        except Exception:
-            pass
-
-        rows5.append([
-            i+1,
-            _fmt_date(L.get("tanggal")) or "",
-            nama_taman,
-            L.get("tanaman",""),
-            L.get("kegiatan",""),
-            L.get("isi_laporan","")
-        ])
-
-    sec5 = _build_table(
-        ["No.", "Tanggal", "Nama Taman", "Nama Tanaman", "Kegiatan", "Isi Laporan"],
-        rows5
-    )
+def _coalesce(chunks, size=64 * 1024):
+    """Group small string chunks into ~size pieces so the server isn't doing one write per row."""
+    buf, n = [], 0
+    try:
+        for c in chunks:
+            buf.append(c)
+            n += len(c)
+            if n >= size:
+                yield "".join(buf)
+                buf, n = [], 0
+        if buf:
+            yield "".join(buf)
+    finally:
+        # client went away mid-stream: close the source so rows_iter hands its conn back
+        if hasattr(chunks, "close"):
+            chunks.close()
 
-    tgl_str = datetime.now().strftime("%d %B %Y")
-    html = f"""<!doctype html>
+REPORT_SOURCE = """<!doctype html>
 <html>
 <head>
 <meta charset="utf-8">
 <title>Laporan Kegiatan Penataan Taman Kota</title>
 <style>
-  body{{ font-family:Inter, Arial, sans-serif; color:#111827; margin:24px; }}
-  h1{{ margin:0 0 8px; font-size:22px }}
-  h2{{ margin:22px 0 8px; font-size:16px }}
-  .muted{{ color:#374151; font-size:12px; margin-bottom:16px }}
-  table{{ width:100%; border-collapse:collapse; margin:8px 0 18px }}
-  th,td{{ border:1px solid #d1d5db; padding:8px 10px; font-size:12px; vertical-align:top }}
-  thead th{{ background:#f3f4f6; font-weight:700 }}
-  .header{{ display:flex; justify-content:space-between; align-items:flex-end; margin-bottom:8px }}
-  @media print{{ @page{{ size:A4; margin:15mm }} body{{ margin:0 }} .noprint{{ display:none !important }} }}
+  body{ font-family:Inter, Arial, sans-serif; color:#111827; margin:24px; }
+  h1{ margin:0 0 8px; font-size:22px }
+  h2{ margin:22px 0 8px; font-size:16px }
+  .muted{ color:#374151; font-size:12px; margin-bottom:16px }
+  table{ width:100%; border-collapse:collapse; margin:8px 0 18px }
+  th,td{ border:1px solid #d1d5db; padding:8px 10px; font-size:12px; vertical-align:top }
+  thead th{ background:#f3f4f6; font-weight:700 }
+  .header{ display:flex; justify-content:space-between; align-items:flex-end; margin-bottom:8px }
+  @media print{ @page{ size:A4; margin:15mm } body{ margin:0 } .noprint{ display:none !important } }
 </style>
 </head>
 <body>
   <div class="header">
     <h1>Laporan Kegiatan Penataan Taman Kota</h1>
-    <div class="muted">Tanggal cetak: {_escape_html(tgl_str)}</div>
+    <div class="muted">Tanggal cetak: {{ tgl_str }}</div>
   </div>
 
   <h2>I. Identitas Taman</h2>
-  {sec1}
+  <table><thead><tr><th>No.</th><th>Nama</th><th>Luas (m²)</th><th>Lokasi</th></tr></thead><tbody>
+  {%- for t in taman %}
+<tr><td>{{ loop.index }}</td><td>{{ t.nama_taman }}</td><td>{{ t.luas_taman }}</td><td>{{ t.lokasi }}</td></tr>
+  {%- endfor %}
+</tbody></table>
 
   <h2>II. Susunan Petugas Taman</h2>
-  {sec2}
+  <table><thead><tr><th>No.</th><th>Nama Petugas</th><th>Jabatan</th></tr></thead><tbody>
+  {%- for p in petugas %}
+<tr><td>{{ loop.index }}</td><td>{{ p.nama_petugas }}</td><td>{{ p.jabatan }}</td></tr>
+  {%- endfor %}
+</tbody></table>
 
   <h2>III. Kegiatan yang Dilakukan</h2>
-  {sec3}
+  <table><thead><tr><th>No.</th><th>Jenis Kegiatan</th></tr></thead><tbody>
+  {%- for k in kegiatan %}
+<tr><td>{{ loop.index }}</td><td>{{ k.jenis_kegiatan }}</td></tr>
+  {%- endfor %}
+</tbody></table>
 
   <h2>IV. Data Tanaman di Taman</h2>
-  {sec4}
+  <table><thead><tr><th>No.</th><th>Nama Taman</th><th>Nama Tanaman</th><th>Nama Ilmiah</th><th>Jenis</th></tr></thead><tbody>
+  {%- for x in tanaman %}
+<tr><td>{{ loop.index }}</td><td>{{ x.nama_taman }}</td><td>{{ x.nama_umum }}</td><td>{{ x.nama_ilmiah }}</td><td>{{ x.jenis }}</td></tr>
+  {%- endfor %}
+</tbody></table>
 
   <h2>V. Laporan Pendataan Penataan Taman Kota</h2>
-  {sec5}
+  <table><thead><tr><th>No.</th><th>Tanggal</th><th>Nama Taman</th><th>Nama Tanaman</th><th>Kegiatan</th><th>Isi Laporan</th></tr></thead><tbody>
+  {%- set shown = namespace(n=0) %}
+  {%- for L in laporan %}
+<tr><td>{{ offset + loop.index }}</td><td>{{ L.tanggal }}</td><td>{{ L.nama_taman }}</td><td>{{ L.tanaman }}</td><td>{{ L.kegiatan }}</td><td>{{ L.isi_laporan }}</td></tr>
+  {%- set shown.n = loop.index %}
+  {%- endfor %}
+</tbody></table>
+  {%- if limit and shown.n == limit %}
+  <div class="muted">Baris {{ offset + 1 }}&ndash;{{ offset + shown.n }} ditampilkan, data berikutnya masih tersedia (offset={{ offset + shown.n }}).</div>
+  {%- endif %}
 
   <div class="muted">Sumber: Sistem Informasi Perawatan Taman Kota</div>
 </body>
 </html>"""
-    return html
+
+# Compiled once at import. Autoescape uses MarkupSafe's C escaper; finalize renders
+# SQL NULLs as empty cells (Jinja would print "None").
+_ENV = Environment(autoescape=select_autoescape(["html"]),
+                   finalize=lambda v: "" if v is None else v)
+_REPORT_TPL = _ENV.from_string(REPORT_SOURCE)
+
+def _stream_report_html(bundle):
+    """
+    Render the report template chunk by chunk (Template.generate), so tanaman/laporan
+    may be lazy row iterators (see rows_iter) and the response can be streamed.
+    limit/offset describe the laporan page; a full page gets a "more available" note.
+    """
+    return _REPORT_TPL.generate(
+        taman=bundle.get("taman") or [],
+        petugas=bundle.get("petugas") or [],
+        kegiatan=bundle.get("kegiatan") or [],
+        tanaman=bundle.get("tanaman") or [],
+        laporan=bundle.get("laporan") or [],
+        limit=bundle.get("limit"),
+        offset=bundle.get("offset") or 0,
+        tgl_str=datetime.now().strftime("%d %B %Y"),
+    )
+
+# Upper bound for laporan rows rendered into one HTML page
+REPORT_HTML_MAX_LIMIT = 5000
 
 @app.get("/api/tanaman_all")
 def list_tanaman_all():
@@ -351,108 +613,97 @@ def list_tanaman_all():
 def report_all():
     """
     Return everything the report page needs in ONE JSON.
-    Optional: ?limit= (default 100000) to cap laporan rows.
+    Optional: ?limit= (default 100000) to cap laporan rows, ?offset= (default 0) to page them.
+    "next_offset" is set when the page came back full (more laporan may follow), else null.
     """
-    limit = request.args.get("limit", default=100000, type=int)
-
-    bundle = {
-        "taman": rows("""
-            SELECT id_taman, nama_taman, luas_taman, lokasi
-            FROM taman
-            ORDER BY nama_taman
-        """),
-        "petugas": rows("""
-            SELECT id_petugas, nama_petugas, jabatan
-            FROM petugas
-            ORDER BY nama_petugas
-        """),
-        "kegiatan": rows("""
-            SELECT id_kegiatan, jenis_kegiatan
-            FROM kegiatan
-            ORDER BY jenis_kegiatan
-        """),
-        "tanaman": rows("""
-            SELECT id_tanaman, id_taman, nama_umum, nama_ilmiah, jenis
-            FROM tanaman
-            ORDER BY id_taman, id_tanaman
-        """),
-        "laporan": rows("""
+    limit = max(request.args.get("limit", default=100000, type=int), 1)
+    offset = max(request.args.get("offset", default=0, type=int), 0)
+
+    tanaman_, laporan = rows_many([
+        ("""
+            SELECT t.id_tanaman, t.id_taman, t.nama_umum, t.nama_ilmiah, t.jenis, tm.nama_taman
+            FROM tanaman t
+            JOIN taman tm ON tm.id_taman = t.id_taman
+            ORDER BY t.id_taman, t.id_tanaman
+        """, None),
+        ("""
             SELECT
                 l.id_laporan,
                 l.id_tanaman,
                 l.id_petugas,
                 l.id_kegiatan,
-                l.tanggal,
+                DATE_FORMAT(l.tanggal, '%Y-%m-%d %H:%i:%S') AS tanggal,
                 l.isi_laporan,
                 t.nama_umum      AS tanaman,
                 p.nama_petugas   AS petugas,
-                k.jenis_kegiatan AS kegiatan
+                k.jenis_kegiatan AS kegiatan,
+                tm.nama_taman    AS nama_taman
             FROM laporan l
             JOIN tanaman  t ON t.id_tanaman = l.id_tanaman
+            JOIN taman   tm ON tm.id_taman  = t.id_taman
             JOIN petugas  p ON p.id_petugas = l.id_petugas
             JOIN kegiatan k ON k.id_kegiatan = l.id_kegiatan
             ORDER BY l.tanggal DESC
-            LIMIT %s
-        """, (limit,))
-    }
-
-    for r in bundle["laporan"]:
-        if isinstance(r.get("tanggal"), datetime):
-            r["tanggal"] = r["tanggal"].isoformat(sep=" ", timespec="seconds")
-
+            LIMIT %s OFFSET %s
+        """, (limit, offset)),
+    ])
+    bundle = {"taman": get_taman(), "petugas": get_petugas(), "kegiatan": get_kegiatan(),
+              "tanaman": tanaman_, "laporan": laporan}
+    bundle["next_offset"] = offset + limit if len(bundle["laporan"]) == limit else None
     return jsonify(bundle)
 
 @app.get("/api/report/html")
 def report_html():
     """
     Server-rendered printable HTML report of the entire database.
-    Optional: ?limit= (default 100000) to cap laporan rows.
+    Optional: ?limit= (default 1000, max 5000) to cap laporan rows, ?offset= (default 0) to page them.
+    A full page ends section V with a note giving the offset of the next page.
     """
-    limit = request.args.get("limit", default=100000, type=int)
-
-    bundle = {
-        "taman": rows("SELECT id_taman, nama_taman, luas_taman, lokasi FROM taman ORDER BY nama_taman"),
-        "petugas": rows("SELECT id_petugas, nama_petugas, jabatan FROM petugas ORDER BY nama_petugas"),
-        "kegiatan": rows("SELECT id_kegiatan, jenis_kegiatan FROM kegiatan ORDER BY jenis_kegiatan"),
-        "tanaman": rows("SELECT id_tanaman, id_taman, nama_umum, nama_ilmiah, jenis FROM tanaman ORDER BY id_taman, id_tanaman"),
-        "laporan": rows("""
+    limit = min(max(request.args.get("limit", default=1000, type=int), 1), REPORT_HTML_MAX_LIMIT)
+    offset = max(request.args.get("offset", default=0, type=int), 0)
+
+    # Streamed straight from the DB into the response (taman etc. come from the cache).
+    # The two iterators run one after the other, each on its own pooled connection.
+    tanaman_ = rows_iter(
+        "SELECT t.id_tanaman, t.id_taman, t.nama_umum, t.nama_ilmiah, t.jenis, tm.nama_taman "
+        "FROM tanaman t JOIN taman tm ON tm.id_taman = t.id_taman ORDER BY t.id_taman, t.id_tanaman")
+    laporan = rows_iter("""
             SELECT
                 l.id_laporan,
                 l.id_tanaman,
                 l.id_petugas,
                 l.id_kegiatan,
-                l.tanggal,
+                DATE_FORMAT(l.tanggal, '%Y-%m-%d %H:%i:%S') AS tanggal,
                 l.isi_laporan,
                 t.nama_umum      AS tanaman,
                 p.nama_petugas   AS petugas,
-                k.jenis_kegiatan AS kegiatan
+                k.jenis_kegiatan AS kegiatan,
+                tm.nama_taman    AS nama_taman
             FROM laporan l
             JOIN tanaman  t ON t.id_tanaman = l.id_tanaman
+            JOIN taman   tm ON tm.id_taman  = t.id_taman
             JOIN petugas  p ON p.id_petugas = l.id_petugas
             JOIN kegiatan k ON k.id_kegiatan = l.id_kegiatan
             ORDER BY l.tanggal DESC
-            LIMIT %s
-        """, (limit,))
-    }
+            LIMIT %s OFFSET %s
+        """, (limit, offset))
+    bundle = {"taman": get_taman(), "petugas": get_petugas(), "kegiatan": get_kegiatan(),
+              "tanaman": tanaman_, "laporan": laporan, "limit": limit, "offset": offset}
 
-    for r in bundle["laporan"]:
-        if isinstance(r.get("tanggal"), datetime):
-            r["tanggal"] = r["tanggal"].isoformat(sep=" ", timespec="seconds")
-
-    html = _build_report_html(bundle)
-    return app.response_class(html, mimetype="text/html")
+    return app.response_class(_coalesce(_stream_report_html(bundle)), mimetype="text/html")
 
 
 # ==== Admin: clear all data (danger) ====
 @app.post("/api/admin/clear_all")
 def admin_clear_all():
     """
-    Danger zone. Deletes all rows in FK-safe order:
+    Danger zone. Empties all tables with TRUNCATE:
       laporan -> tanaman -> petugas -> kegiatan -> taman
 
-    Call with JSON body: { "confirm": true, "reset_auto_increment": true }
+    Call with JSON body: { "confirm": true }
     - "confirm" is required to avoid accidental wipes
-    - "reset_auto_increment" (default True) will reset AUTO_INCREMENT counters
+    - AUTO_INCREMENT counters are always reset (TRUNCATE does that); a
+      "reset_auto_increment" key is accepted for compatibility and ignored
     """
     try:
         payload = request.get_json(force=True, silent=True) or {}
@@ -462,32 +713,24 @@ def admin_clear_all():
     if not payload.get("confirm"):
         return {"error": "confirmation required: set {\"confirm\": true} in JSON body"}, 400
 
-    reset_ai = bool(payload.get("reset_auto_increment", True))
-
+    tables = ["laporan", "tanaman", "petugas", "kegiatan", "taman"]
     conn = get_conn()
     try:
         with conn.cursor() as cur:
-            # Delete in FK-safe order
-            cur.execute("DELETE FROM laporan")
-            cur.execute("DELETE FROM tanaman")
-            cur.execute("DELETE FROM petugas")
-            cur.execute("DELETE FROM kegiatan")
-            cur.execute("DELETE FROM taman")
-
-            # Optionally reset AUTO_INCREMENT for a clean slate
-            if reset_ai:
-                for tbl in ("laporan", "tanaman", "petugas", "kegiatan", "taman"):
-                    try:
-                        cur.execute(f"ALTER TABLE {tbl} AUTO_INCREMENT = 1")
-                    except mysql.connector.Error:
-                        # Non-fatal; skip if not supported
-                        pass
-
-        conn.commit()
+            # TRUNCATE refuses FK-referenced tables unless checks are off.
+            # Always switch them back on: this session goes back to the pool.
+            cur.execute("SET FOREIGN_KEY_CHECKS=0")
+            try:
+                for tbl in tables:
+                    cur.execute(f"TRUNCATE TABLE {tbl}")
+            finally:
+                cur.execute("SET FOREIGN_KEY_CHECKS=1")
+
+        clear_cache()
         return {
             "status": "ok",
-            "cleared": ["laporan", "tanaman", "petugas", "kegiatan", "taman"],
-            "reset_auto_increment": reset_ai
+            "cleared": tables,
+            "reset_auto_increment": True
         }
     except mysql.connector.Error as e:
         conn.rollback()
@@ -498,4 +741,5 @@ def admin_clear_all():
 
 if __name__ == "__main__":
     # Bind to all interfaces (fixes localhost/::1 issues). Visit from 127.0.0.1:5000
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Dev server only; use wsgi.py under gunicorn/waitress for real deployments
+    app.run(host="0.0.0.0", port=5000, debug=False, threaded=True)
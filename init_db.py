@@ -76,6 +76,16 @@ DDL = [
     """
 ]
 
+# --- Indexes added after the initial schema ---
+# CREATE TABLE IF NOT EXISTS won't touch existing tables, so these are applied
+# separately (and skipped if already present). They match the ORDER BY of the
+# list endpoints; (nama_petugas, jabatan) also covers SELECT id, nama, jabatan.
+# taman is already served by uk_taman_nama, laporan by ix_laporan_tanggal.
+INDEXES = [
+    ("petugas",  "ix_petugas_nama",   "(nama_petugas, jabatan)"),
+    ("kegiatan", "ix_kegiatan_jenis", "(jenis_kegiatan)"),
+]
+
 def create_database_if_needed():
     """Create the database using a server-level connection (no database selected)."""
     conn = mysql.connector.connect(
@@ -107,6 +117,21 @@ def run_table_ddls():
     finally:
         conn.close()
 
+def ensure_indexes():
+    """Create INDEXES that are missing (MySQL has no CREATE INDEX IF NOT EXISTS)."""
+    conn = connect_database()
+    try:
+        with conn.cursor() as cur:
+            for table, name, cols in INDEXES:
+                try:
+                    cur.execute(f"CREATE INDEX {name} ON {table} {cols}")
+                except mysql.connector.Error as err:
+                    if err.errno != errorcode.ER_DUP_KEYNAME:
+                        raise
+        conn.commit()
+    finally:
+        conn.close()
+
 def main():
     try:
         # Step 1: Ensure DB exists
@@ -117,6 +142,10 @@ def main():
         run_table_ddls()
         print("[OK] All tables ensured (created if missing).")
 
+        # Step 3: Secondary indexes
+        ensure_indexes()
+        print("[OK] Indexes ensured.")
+
     except mysql.connector.Error as err:
         if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
             print("Error: invalid MySQL credentials (user/password).")
@@ -1,10 +1,18 @@
 # run_both.py
+import io
 import os
 import sys
+import errno
+import select
 import signal
 import socket
+import time
+import selectors
 import threading
 import subprocess
+import importlib.util
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from shutil import which
 
@@ -20,53 +28,121 @@ INIT = os.environ.get("INIT_DB_PATH") or str(ROOT / "init_db.py")     # DB initi
 PORT_APP  = int(os.environ.get("APP_PORT", 5000))
 PORT_AUTH = int(os.environ.get("AUTH_PORT", 5001))
 
-env_app = os.environ.copy()
-env_auth = os.environ.copy()
-env_app["PYTHONUNBUFFERED"] = "1"
-env_auth["PYTHONUNBUFFERED"] = "1"
-# location for auth sqlite file can be overridden via ENV
-env_auth.setdefault("AUTH_SQLITE_PATH", str(ROOT / "auth.sqlite3"))
+# Per-service env overrides (applied on top of os.environ at spawn time).
+# Location for auth sqlite file can be overridden via ENV.
+AUTH_ENV = {"AUTH_SQLITE_PATH": os.environ.get("AUTH_SQLITE_PATH", str(ROOT / "auth.sqlite3"))}
 
-def stream(prefix: str, proc: subprocess.Popen):
+def child_env(overrides=None) -> dict:
+    return {**os.environ, "PYTHONUNBUFFERED": "1", **(overrides or {})}
+
+def stream(pfx: bytes, proc: subprocess.Popen):
+    """
+    Reader-thread path (Windows). Lines are forwarded as raw bytes behind a
+    precomputed prefix: no decode, no per-line formatting, one write per line
+    (a single write keeps the two threads' lines from interleaving).
+    """
+    out = sys.stdout.buffer
     for line in iter(proc.stdout.readline, b""):
-        try:
-            sys.stdout.write(f"[{prefix}] {line.decode(errors='replace')}")
-        except Exception:
-            # Fallback raw
-            sys.stdout.write(f"[{prefix}] {line!r}\n")
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        out.write(pfx + line)
+        out.flush()
     try:
         proc.stdout.close()
     except Exception:
         pass
 
-def start(cmd, env, prefix: str) -> subprocess.Popen:
+def pump(sel: selectors.BaseSelector, key: selectors.SelectorKey):
+    """
+    Drain whatever a child's (non-blocking) stdout pipe has ready and write all
+    complete lines, prefixed, to our stdout in a single write.
+    key.data is ("pipe", prefix_bytes, partial_line_buffer).
+    Returns True if it read data (more may be waiting), None on EOF / nothing ready.
+    """
+    _, pfx, buf = key.data
+    try:
+        chunk = os.read(key.fd, 1 << 16)
+    except BlockingIOError:
+        return
+    if not chunk:
+        # EOF: flush an unterminated last line and stop watching the pipe
+        if buf:
+            sys.stdout.buffer.write(pfx + bytes(buf) + b"\n")
+            sys.stdout.buffer.flush()
+        sel.unregister(key.fileobj)
+        key.fileobj.close()
+        return
+    buf += chunk
+    *lines, rest = buf.split(b"\n")
+    if lines:
+        sys.stdout.buffer.write(b"".join(pfx + line + b"\n" for line in lines))
+        sys.stdout.buffer.flush()
+    buf[:] = rest
+    return True
+
+def flush_pipes(sel: selectors.BaseSelector):
+    """Print everything still sitting in the registered child pipes (non-blocking)."""
+    for key in list(sel.get_map().values()):
+        if key.data[0] == "pipe":
+            while pump(sel, key):
+                pass
+
+def spawn(cmd, env_overrides: dict) -> subprocess.Popen:
     """
-    Start a python subprocess and stream its output with a prefix.
+    Start a python subprocess with its stdout+stderr on a pipe.
+    The child gets os.environ + PYTHONUNBUFFERED=1 + env_overrides.
     Creates a new process group for easier termination on all platforms.
     """
     creationflags = 0
-    preexec = None
     if os.name == "nt":
         creationflags = subprocess.CREATE_NEW_PROCESS_GROUP  # so we can send CTRL_BREAK_EVENT
-    else:
-        # start in a new process group on POSIX
-        preexec = os.setsid
 
-    p = subprocess.Popen(
+    return subprocess.Popen(
         [PY, "-u"] + cmd,
         cwd=ROOT,
-        env=env,
+        env=child_env(env_overrides),
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         bufsize=1,
         universal_newlines=False,
         creationflags=creationflags,
-        preexec_fn=preexec,
+        # new session/process group on POSIX (setsid in the child; unlike a
+        # preexec_fn this is safe while other threads are spawning too)
+        start_new_session=os.name != "nt",
     )
-    t = threading.Thread(target=stream, args=(prefix, p), daemon=True)
-    t.start()
+
+def watch(p: subprocess.Popen, prefix: str, sel: selectors.BaseSelector = None) -> subprocess.Popen:
+    """
+    Stream p's output with a prefix. With a selector (POSIX), the stdout pipe is
+    registered on it and drained by the main loop; without one (Windows: pipes
+    aren't selectable) a reader thread does it.
+    """
+    pfx = f"[{prefix}] ".encode()
+    if sel is not None:
+        os.set_blocking(p.stdout.fileno(), False)
+        sel.register(p.stdout, selectors.EVENT_READ, data=("pipe", pfx, bytearray()))
+    else:
+        t = threading.Thread(target=stream, args=(pfx, p), daemon=True)
+        t.start()
     return p
 
+def start_all(services, procs: list, sel: selectors.BaseSelector = None):
+    """
+    Spawn all (cmd, env_overrides, prefix) services in parallel, then hook up
+    their output from this thread (selectors aren't thread-safe). Every child
+    that did start ends up in `procs`, even if another one failed to.
+    """
+    with ThreadPoolExecutor(max_workers=len(services)) as ex:
+        futures = [ex.submit(spawn, cmd, env) for cmd, env, _ in services]
+    error = None
+    for (_, _, prefix), f in zip(services, futures):
+        try:
+            procs.append(watch(f.result(), prefix, sel))
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        raise error
+
 # -------------------------
 # Optional: run DB initializer once
 # -------------------------
@@ -87,7 +163,49 @@ def run_init_db():
         return
 
     print(f"[INIT] Running: {init_path}")
-    proc = subprocess.run([PY, "-u", init_path], cwd=ROOT, env=env_app,
+    # In-process: no interpreter boot, no pipes. Its output is captured so it
+    # still gets the [INIT] prefix.
+    out = io.StringIO()
+    with redirect_stdout(out):
+        init_main = load_init_main(init_path)
+    if init_main is None:
+        run_init_db_subprocess(init_path)
+        return
+
+    code = 0
+    try:
+        with redirect_stdout(out):
+            init_main()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        print(f"[INIT-ERR] {type(e).__name__}: {e}", file=sys.stderr)
+        code = 1
+    finally:
+        for line in out.getvalue().splitlines():
+            print(f"[INIT] {line}")
+
+    if code != 0:
+        print(f"[INIT] init_db exited with code {code}", file=sys.stderr)
+    else:
+        print("[INIT] Database initialization completed.")
+
+def load_init_main(init_path: str):
+    """
+    Import the initializer as a module and return its main(), or None if it
+    can't be imported or has no callable main (caller falls back to a subprocess).
+    """
+    try:
+        spec = importlib.util.spec_from_file_location("init_db", init_path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+    except Exception:
+        return None
+    main = getattr(mod, "main", None)
+    return main if callable(main) else None
+
+def run_init_db_subprocess(init_path: str):
+    proc = subprocess.run([PY, "-u", init_path], cwd=ROOT, env=child_env(),
                           capture_output=True, text=True)
     if proc.stdout:
         for line in proc.stdout.splitlines():
@@ -106,7 +224,24 @@ def run_init_db():
 # -------------------------
 # Port helpers (optional kill-on-use)
 # -------------------------
+# errno values meaning "someone else has this port" for a bind() probe (POSIX + Winsock)
+_BIND_BUSY = {errno.EADDRINUSE, errno.EACCES,
+              getattr(errno, "WSAEADDRINUSE", None), getattr(errno, "WSAEACCES", None)} - {None}
+
 def is_port_in_use(port: int, host: str = "127.0.0.1") -> bool:
+    """
+    Default: try to connect (detects a *listening* server; costs a handshake or
+    the 0.4 s timeout). PORT_PROBE=bind: try to bind the port instead, a local
+    syscall that also reports ports that are bound but not (yet) listening.
+    """
+    if os.environ.get("PORT_PROBE") == "bind":
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 0)
+            try:
+                s.bind((host, port))
+                return False
+            except OSError as e:
+                return e.errno in _BIND_BUSY
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.settimeout(0.4)
         try:
@@ -114,15 +249,21 @@ def is_port_in_use(port: int, host: str = "127.0.0.1") -> bool:
         except Exception:
             return False
 
-def kill_port_windows(port: int):
+def kill_ports_windows(ports):
+    """
+    Free all `ports` with a single PowerShell invocation (its cold start is
+    ~0.5 s, so one launch per port adds up).
+    """
     ps = which("powershell")
     if not ps:
-        print(f"[PORT] PowerShell not available; cannot free port {port} automatically.", file=sys.stderr)
+        print(f"[PORT] PowerShell not available; cannot free ports {ports} automatically.", file=sys.stderr)
         return
     cmd = [
         ps, "-NoProfile", "-Command",
-        f"$p=(Get-NetTCPConnection -LocalPort {port} -State Listen -ErrorAction SilentlyContinue).OwningProcess;"
-        f"if($p){{ Stop-Process -Id $p -Force }}"
+        f"@({','.join(str(p) for p in ports)}) | ForEach-Object {{"
+        f" Get-NetTCPConnection -LocalPort $_ -State Listen -ErrorAction SilentlyContinue }} |"
+        f" Select-Object -ExpandProperty OwningProcess -Unique |"
+        f" ForEach-Object {{ Stop-Process -Id $_ -Force -ErrorAction SilentlyContinue }}"
     ]
     subprocess.run(cmd, capture_output=True)
 
@@ -142,21 +283,25 @@ def kill_port_posix(port: int):
     else:
         print(f"[PORT] lsof not found; cannot free port {port} automatically.", file=sys.stderr)
 
-def ensure_port_free(port: int):
-    if not is_port_in_use(port):
+def ensure_ports_free(ports):
+    busy = [port for port in ports if is_port_in_use(port)]
+    if not busy:
         return
     if os.environ.get("KILL_PORTS") == "1":
-        print(f"[PORT] Port {port} busy. Attempting to free it...")
+        print(f"[PORT] Port(s) {', '.join(map(str, busy))} busy. Attempting to free them...")
         if os.name == "nt":
-            kill_port_windows(port)
-        else:
-            kill_port_posix(port)
-        if is_port_in_use(port):
-            print(f"[PORT] Could not free port {port}. You may need to stop the process manually.", file=sys.stderr)
+            kill_ports_windows(busy)
         else:
-            print(f"[PORT] Port {port} freed.")
+            for port in busy:
+                kill_port_posix(port)
+        for port in busy:
+            if is_port_in_use(port):
+                print(f"[PORT] Could not free port {port}. You may need to stop the process manually.", file=sys.stderr)
+            else:
+                print(f"[PORT] Port {port} freed.")
     else:
-        print(f"[PORT] WARNING: Port {port} is already in use. Set KILL_PORTS=1 to auto-kill the holder.", file=sys.stderr)
+        for port in busy:
+            print(f"[PORT] WARNING: Port {port} is already in use. Set KILL_PORTS=1 to auto-kill the holder.", file=sys.stderr)
 
 # -------------------------
 # Graceful shutdown & interactive quit
@@ -183,6 +328,7 @@ def terminate_process(p: subprocess.Popen):
 def wait_for_quit(stop_callback):
     """
     Allow stopping both servers by typing 'q' + Enter in this terminal.
+    Windows only: elsewhere stdin is watched by the selector loop (wait_children).
     """
     try:
         print("Type 'q' and press Enter to stop both servers.")
@@ -197,10 +343,173 @@ def wait_for_quit(stop_callback):
         # stdin might be closed; ignore
         pass
 
+def open_pidfd(p: subprocess.Popen):
+    """
+    Return a pidfd for p (Linux >= 5.3, Python >= 3.9) that becomes readable when
+    the child exits, or None where pidfds aren't available.
+    """
+    try:
+        return os.pidfd_open(p.pid)
+    except (AttributeError, OSError):
+        return None
+
+def open_pidfds(procs) -> dict:
+    """
+    {pidfd: proc} for every child, or {} unless all of them could be opened.
+    """
+    pidfds = {}
+    for p in procs:
+        fd = open_pidfd(p)
+        if fd is None:
+            for fd in pidfds:
+                os.close(fd)
+            return {}
+        pidfds[fd] = p
+    return pidfds
+
+def wait_children(sel: selectors.BaseSelector, procs, pidfds: dict, stop_all):
+    """
+    Single event loop for the launcher (POSIX): child stdout pipes (registered by
+    watch()), stdin (for 'q') and the children's pidfds all live on `sel`, so we
+    block in the kernel until something actually happens. Without pidfds
+    (macOS, kernels < 5.3) it falls back to a 0.5 s select timeout + poll().
+    Returns once every child has exited. The pidfds stay open (owned by main()).
+    A signal (see install_signal_wakeup) returns at once; main() then stops the
+    children and keeps printing their output while they exit (drain_children).
+    """
+    for fd, p in pidfds.items():
+        sel.register(fd, selectors.EVENT_READ, data=("pid", p))
+    timeout = None if pidfds else 0.5
+
+    # stdin is read with one os.read() per readiness event, which never blocks and
+    # never waits for a full line. It stays in blocking mode: O_NONBLOCK would land
+    # on the terminal's file description, which our stdout shares.
+    try:
+        sel.register(sys.stdin.fileno(), selectors.EVENT_READ, data=("stdin", bytearray()))
+        print("Type 'q' and press Enter to stop both servers.")
+    except (AttributeError, ValueError, OSError):
+        pass  # stdin closed / not selectable
+
+    while True:
+        for key, _ in sel.select(timeout):
+            kind = key.data[0]
+            if kind == "pipe":
+                pump(sel, key)
+            elif kind == "stdin":
+                buf = key.data[1]
+                chunk = os.read(key.fd, 4096)
+                if not chunk:
+                    sel.unregister(key.fd)  # EOF
+                    continue
+                buf += chunk
+                *lines, rest = buf.split(b"\n")
+                buf[:] = rest
+                if any(line.strip().lower() in (b"q", b"quit", b"exit") for line in lines):
+                    sel.unregister(key.fd)
+                    stop_all()
+            elif kind == "signal":
+                drain_fd(key.fd)
+                return
+            else:
+                sel.unregister(key.fd)
+                key.data[1].wait()
+        if all(p.poll() is not None for p in procs):
+            break
+    # Children are gone: print whatever is still sitting in their pipes
+    flush_pipes(sel)
+
+def drain_fd(fd: int):
+    """Discard everything readable on a non-blocking fd (the signal wakeup pipe)."""
+    try:
+        while os.read(fd, 512):
+            pass
+    except BlockingIOError:
+        pass
+
+WAKE_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+def install_signal_wakeup(sel: selectors.BaseSelector):
+    """
+    Turn SIGINT/SIGTERM into read events on `sel` (POSIX): the Python-level
+    handlers are no-ops and the interpreter writes each signal number to a
+    self-pipe (signal.set_wakeup_fd), so Ctrl+C is handled by the event loop
+    instead of surfacing as a KeyboardInterrupt wherever we happen to be.
+    Returns a callable that restores the previous handlers and closes the pipe.
+    """
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    os.set_blocking(w, False)
+    old_handlers = {sig: signal.signal(sig, lambda *a: None) for sig in WAKE_SIGNALS}
+    old_fd = signal.set_wakeup_fd(w)
+    sel.register(r, selectors.EVENT_READ, data=("signal",))
+
+    def restore():
+        signal.set_wakeup_fd(old_fd)
+        for sig, handler in old_handlers.items():
+            signal.signal(sig, handler)
+        os.close(r)
+        os.close(w)
+    return restore
+
+def drain_children(sel: selectors.BaseSelector, procs, pidfds: dict, timeout: float = 5):
+    """
+    Shutdown phase (POSIX), after stop_all(): keep the event loop running so the
+    children's last words still reach the terminal, until they have all exited
+    or `timeout` s have passed (stragglers are left for reap() to kill).
+    Another signal cuts the wait short.
+    """
+    for key in list(sel.get_map().values()):
+        if key.data[0] == "signal":
+            drain_fd(key.fd)  # the signal that got us here (if any) doesn't count
+    for fd, p in pidfds.items():
+        try:
+            sel.get_key(fd)
+        except KeyError:
+            if p.poll() is None:
+                sel.register(fd, selectors.EVENT_READ, data=("pid", p))
+    deadline = time.monotonic() + timeout
+    while any(p.poll() is None for p in procs):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        for key, _ in sel.select(remaining if pidfds else min(remaining, 0.5)):
+            kind = key.data[0]
+            if kind == "pipe":
+                pump(sel, key)
+            elif kind == "pid":
+                sel.unregister(key.fd)
+                key.data[1].wait()
+            elif kind == "stdin":
+                sel.unregister(key.fd)  # no longer interested in 'q'
+            else:
+                return
+    flush_pipes(sel)
+
+def reap(procs, pidfds: dict, timeout: float = 5):
+    """
+    Wait up to `timeout` s per child, then kill it. With a pidfd we sleep in the
+    kernel until the child actually exits (select() on the pidfd) instead of
+    Popen.wait()'s sleep/poll loop; p.wait() afterwards only collects the status.
+    """
+    fd_of = {p: fd for fd, p in pidfds.items()}
+    for p in procs:
+        try:
+            fd = fd_of.get(p)
+            if fd is None:
+                p.wait(timeout=timeout)
+            elif select.select([fd], [], [], timeout)[0]:
+                p.wait()
+            else:
+                raise subprocess.TimeoutExpired(p.args, timeout)
+        except Exception:
+            try:
+                p.kill()
+            except Exception:
+                pass
+
 def main():
     # Optionally ensure ports are free
-    ensure_port_free(PORT_APP)
-    ensure_port_free(PORT_AUTH)
+    ensure_ports_free([PORT_APP, PORT_AUTH])
 
     # Run DB initializer first
     run_init_db()
@@ -211,37 +520,55 @@ def main():
         for p in procs:
             terminate_process(p)
 
-    # Start interactive "q" listener
-    tq = threading.Thread(target=wait_for_quit, args=(stop_all,), daemon=True)
-    tq.start()
+    sel = selectors.DefaultSelector() if os.name != "nt" else None
+    pidfds = {}
+    restore_signals = None
 
     try:
-        procs.append(start([APP],  env_app,  f"DATA:{PORT_APP}"))
-        procs.append(start([AUTH], env_auth, f"AUTH:{PORT_AUTH}"))
+        if sel is not None:
+            restore_signals = install_signal_wakeup(sel)
+        # init_db (above) stays serialized: the data API reads what it creates
+        start_all([
+            ([APP],  {},       f"DATA:{PORT_APP}"),
+            ([AUTH], AUTH_ENV, f"AUTH:{PORT_AUTH}"),
+        ], procs, sel)
 
-        # Wait for any process to exit
-        while True:
-            alive = [p for p in procs if p.poll() is None]
-            if not alive:
-                break
-            for p in list(alive):
-                try:
-                    p.wait(timeout=0.5)
-                except Exception:
-                    pass
+        if sel is not None:
+            pidfds = open_pidfds(procs)
+            wait_children(sel, procs, pidfds, stop_all)
+        else:
+            # Windows: reader threads + polling
+            tq = threading.Thread(target=wait_for_quit, args=(stop_all,), daemon=True)
+            tq.start()
+
+            # Wait for all processes to exit
+            while True:
+                alive = [p for p in procs if p.poll() is None]
+                if not alive:
+                    break
+                for p in list(alive):
+                    try:
+                        p.wait(timeout=0.5)
+                    except Exception:
+                        pass
     finally:
         stop_all()
-        # Ensure termination
-        for p in procs:
-            try:
-                p.wait(timeout=5)
-            except Exception:
-                try:
-                    p.kill()
-                except Exception:
-                    pass
+        if sel is not None:
+            # Grace period with output still flowing; whoever is left gets killed below
+            drain_children(sel, procs, pidfds)
+            sel.close()
+            reap(procs, pidfds, timeout=0)
+        else:
+            # Ensure termination
+            reap(procs, pidfds)
+        for fd in pidfds:
+            os.close(fd)
+        if restore_signals is not None:
+            restore_signals()
 
 if __name__ == "__main__":
+    # POSIX handles Ctrl+C inside the event loop once the services are up; this
+    # only covers Windows and a Ctrl+C during the port check / init_db phase.
     try:
         main()
     except KeyboardInterrupt:
@@ -4,11 +4,16 @@ Seed data injector for the `tamankota` database.
 Usage examples:
     python seed_tamankota.py                 # seed with defaults
     python seed_tamankota.py --laporan-per-tanaman 5
+    python seed_tamankota.py --laporan-per-tanaman 500 --fast-bulk
     python seed_tamankota.py --host 127.0.0.1 --user root --password '' --db tamankota
 
 Notes:
 - Assumes schema already exists (tables taman, tanaman, petugas, kegiatan, laporan).
 - Idempotent-ish for `taman` via UNIQUE(nama_taman); others may accumulate on repeated runs.
+- laporan is bulk-loaded with LOAD DATA LOCAL INFILE (needs local_infile=ON on the
+  server); falls back to batched INSERTs when the server refuses it.
+- --fast-bulk drops laporan's droppable secondary indexes for the load and rebuilds
+  them afterwards (don't use it while app.py is serving queries).
 - Uses only stdlib + mysql-connector-python.
 
 Dependencies:
@@ -17,10 +22,13 @@ Dependencies:
 from __future__ import annotations
 
 import argparse
+import os
 import random
+import tempfile
 from datetime import datetime, timedelta
 
 import mysql.connector
+from mysql.connector import errorcode
 
 # -------------------------------
 # Helpers
@@ -33,9 +41,103 @@ def connect_mysql(host: str, port: int, user: str, password: str, db: str):
         user=user,
         password=password,
         database=db,
+        allow_local_infile=True,  # seed_laporan bulk-loads via LOAD DATA LOCAL INFILE
     )
 
 
+def insert_many(cur, sql: str, rows: list, batch: int = 1000):
+    """executemany() in slices: each slice becomes one multi-row INSERT (one round trip)
+    while staying well under max_allowed_packet."""
+    for i in range(0, len(rows), batch):
+        cur.executemany(sql, rows[i:i + batch])
+
+
+# Server/client refusals of LOCAL INFILE -> fall back to executemany()
+_LOCAL_INFILE_REFUSED = {
+    errorcode.ER_NOT_ALLOWED_COMMAND,               # server local_infile=OFF
+    errorcode.ER_CLIENT_LOCAL_FILES_DISABLED,       # client side disabled
+    errorcode.CR_LOAD_DATA_LOCAL_INFILE_REJECTED,   # connector path restrictions
+}
+
+
+def _tsv_field(value) -> str:
+    # LOAD DATA's default escaping (ESCAPED BY '\\'): \N is NULL; escape backslash, tab, newline
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def load_data_local(cur, table: str, columns: tuple, rows: list) -> bool:
+    """
+    Stream rows into `table` through a temporary TSV file and LOAD DATA LOCAL
+    INFILE (no per-row SQL parsing). Returns False if LOCAL INFILE is refused,
+    so the caller can fall back to insert_many().
+    """
+    fd, path = tempfile.mkstemp(suffix=".tsv", text=False)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.writelines("\t".join(map(_tsv_field, row)) + "\n" for row in rows)
+        try:
+            cur.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,),
+            )
+        except mysql.connector.Error as e:
+            if e.errno in _LOCAL_INFILE_REFUSED:
+                return False
+            raise
+        return True
+    finally:
+        os.remove(path)
+
+
+def drop_secondary_indexes(cur, table: str) -> list:
+    """
+    Drop `table`'s non-unique B-tree indexes and return the ADD INDEX clauses to
+    rebuild them. Indexes whose leading column backs a foreign key are kept:
+    InnoDB refuses to drop those (error 1553).
+    Note: ALTER TABLE commits implicitly, so call this before any seeding DML.
+    """
+    cur.execute(
+        "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL",
+        (table,),
+    )
+    fk_columns = {r[0] for r in cur.fetchall()}
+
+    cur.execute(f"SHOW INDEX FROM {table} WHERE Non_unique = 1")
+    names = [d[0] for d in cur.description]
+    parts = {}
+    for r in cur.fetchall():
+        r = dict(zip(names, r))
+        parts.setdefault(r["Key_name"], []).append(r)
+
+    drops, clauses = [], []
+    for key, cols in parts.items():
+        cols.sort(key=lambda c: c["Seq_in_index"])
+        if (cols[0]["Column_name"] in fk_columns or cols[0]["Index_type"] != "BTREE"
+                or any(c["Column_name"] is None for c in cols)):  # FK-backing / FULLTEXT / functional
+            continue
+        col_sql = ", ".join(
+            f"{c['Column_name']}"
+            + (f"({c['Sub_part']})" if c["Sub_part"] else "")
+            + (" DESC" if c["Collation"] == "D" else "")
+            for c in cols
+        )
+        drops.append(f"DROP INDEX {key}")
+        clauses.append(f"ADD INDEX {key} ({col_sql})")
+    if drops:
+        cur.execute(f"ALTER TABLE {table} " + ", ".join(drops))
+    return clauses
+
+
+def restore_indexes(cur, table: str, clauses: list):
+    """Re-create the indexes dropped by drop_secondary_indexes (one ALTER, one rebuild pass)."""
+    if clauses:
+        cur.execute(f"ALTER TABLE {table} " + ", ".join(clauses))
+
+
 def seed_taman(cur) -> dict:
     taman_list = [
         ("Taman Mentari", 1200, "Jl. Sudirman"),
@@ -47,10 +149,13 @@ def seed_taman(cur) -> dict:
         "INSERT INTO taman (nama_taman, luas_taman, lokasi) VALUES (%s, %s, %s) "
         "ON DUPLICATE KEY UPDATE luas_taman=VALUES(luas_taman), lokasi=VALUES(lokasi)"
     )
-    for row in taman_list:
-        cur.execute(sql, row)
-    # fetch ids
-    cur.execute("SELECT id_taman, nama_taman FROM taman")
+    insert_many(cur, sql, taman_list)
+    # fetch ids of just these rows (upserts don't report the existing row's id)
+    names = [row[0] for row in taman_list]
+    cur.execute(
+        f"SELECT id_taman, nama_taman FROM taman WHERE nama_taman IN ({', '.join(['%s'] * len(names))})",
+        names,
+    )
     return {r[1]: r[0] for r in cur.fetchall()}
 
 
@@ -62,10 +167,12 @@ def seed_petugas(cur) -> dict:
         ("Rina Kartika", "Petugas Lapangan"),
     ]
     sql = "INSERT INTO petugas (nama_petugas, jabatan) VALUES (%s, %s)"
+    # ids straight from lastrowid: no re-SELECT, and rows from earlier runs aren't picked up
+    ids = {}
     for row in petugas_list:
         cur.execute(sql, row)
-    cur.execute("SELECT id_petugas, nama_petugas FROM petugas")
-    return {r[1]: r[0] for r in cur.fetchall()}
+        ids[row[0]] = cur.lastrowid
+    return ids
 
 
 def seed_kegiatan(cur) -> dict:
@@ -78,10 +185,11 @@ def seed_kegiatan(cur) -> dict:
         ("Pembersihan",),
     ]
     sql = "INSERT INTO kegiatan (jenis_kegiatan) VALUES (%s)"
+    ids = {}
     for row in kegiatan_list:
         cur.execute(sql, row)
-    cur.execute("SELECT id_kegiatan, jenis_kegiatan FROM kegiatan")
-    return {r[1]: r[0] for r in cur.fetchall()}
+        ids[row[0]] = cur.lastrowid
+    return ids
 
 
 def seed_tanaman(cur, taman_ids: dict) -> dict:
@@ -98,15 +206,14 @@ def seed_tanaman(cur, taman_ids: dict) -> dict:
         "INSERT INTO tanaman (id_taman, nama_umum, nama_ilmiah, jenis) "
         "VALUES (%s, %s, %s, %s)"
     )
+    rows = [(id_tmn, *random.choice(sample_plants)) for id_tmn in taman_ids.values() for _ in range(4)]  # 4 plants per taman
+    # Row-at-a-time on purpose: each lastrowid is needed, and it's only 4 rows per taman
     inserted = []
-    for nama_taman, id_tmn in taman_ids.items():
-        for _ in range(4):  # 4 plants per taman
-            nm_umum, nm_ilmiah, jenis = random.choice(sample_plants)
-            cur.execute(sql, (id_tmn, nm_umum, nm_ilmiah, jenis))
-            inserted.append((cur.lastrowid, id_tmn, nm_umum))
-    # fetch all for mapping
-    cur.execute("SELECT id_tanaman, id_taman, nama_umum FROM tanaman")
-    return {(r[0]): (r[1], r[2]) for r in cur.fetchall()}  # id_tanaman -> (id_taman, nama_umum)
+    for row in rows:
+        cur.execute(sql, row)
+        inserted.append((cur.lastrowid, row[0], row[1]))
+    # Only this run's plants: earlier runs' tanaman don't get new laporan
+    return {row[0]: (row[1], row[2]) for row in inserted}  # id_tanaman -> (id_taman, nama_umum)
 
 
 def seed_laporan(cur, tanaman_map: dict, petugas_ids: dict, kegiatan_ids: dict, laporan_per_tanaman: int = 2):
@@ -117,13 +224,24 @@ def seed_laporan(cur, tanaman_map: dict, petugas_ids: dict, kegiatan_ids: dict,
         "VALUES (%s, %s, %s, %s, %s)"
     )
     now = datetime.now()
-    for id_tanaman, (_id_taman, nama_umum) in tanaman_map.items():
-        for i in range(laporan_per_tanaman):
-            pid = random.choice(petugas_id_list)
-            kid = random.choice(kegiatan_id_list)
-            when = now - timedelta(days=random.randint(0, 30), hours=random.randint(0, 23))
-            isi = f"{i+1}. Catatan {nama_umum}: kegiatan rutin"
-            cur.execute(sql, (id_tanaman, pid, kid, when, isi))
+    total = len(tanaman_map) * laporan_per_tanaman
+    # One C-level random.choices() per column instead of 4 RNG calls per row;
+    # the 31 x 24 possible (day, hour) offsets are built once and sampled.
+    pids = random.choices(petugas_id_list, k=total)
+    kids = random.choices(kegiatan_id_list, k=total)
+    offsets = [timedelta(days=d, hours=h) for d in range(31) for h in range(24)]
+    whens = [now - off for off in random.choices(offsets, k=total)]
+    keys = [(id_tanaman, nama_umum, i)
+            for id_tanaman, (_id_taman, nama_umum) in tanaman_map.items()
+            for i in range(laporan_per_tanaman)]
+    rows = [
+        (id_tanaman, pids[j], kids[j], whens[j], f"{i+1}. Catatan {nama_umum}: kegiatan rutin")
+        for j, (id_tanaman, nama_umum, i) in enumerate(keys)
+    ]
+    columns = ("id_tanaman", "id_petugas", "id_kegiatan", "tanggal", "isi_laporan")
+    if not load_data_local(cur, "laporan", columns, rows):
+        print("[INFO] LOAD DATA LOCAL INFILE not allowed; falling back to batched INSERTs.")
+        insert_many(cur, sql, rows)
 
 
 # -------------------------------
@@ -138,32 +256,55 @@ def main():
     parser.add_argument("--password", default="")
     parser.add_argument("--db", default="tamankota")
     parser.add_argument("--laporan-per-tanaman", type=int, default=2)
+    parser.add_argument("--fast-bulk", action="store_true",
+                        help="drop laporan's secondary indexes during the load and rebuild them after")
 
     args = parser.parse_args()
 
     conn = connect_mysql(args.host, args.port, args.user, args.password, args.db)
+    dropped = []
     try:
         conn.autocommit = False
         cur = conn.cursor()
+        # Binary-protocol cursor for the row-at-a-time INSERTs: each statement is
+        # parsed once server-side and then only re-bound. Batched executemany() and
+        # SELECTs stay on the plain cursor (a prepared executemany runs row by row).
+        pcur = conn.cursor(prepared=True)
+
+        if args.fast_bulk:
+            # Before any DML: ALTER TABLE implicitly commits
+            dropped = drop_secondary_indexes(cur, "laporan")
+            if dropped:
+                print(f"[INFO] fast-bulk: {len(dropped)} laporan index(es) dropped; rebuilt after the load.")
 
-        # Seed in FK-safe order
-        taman_ids = seed_taman(cur)
-        petugas_ids = seed_petugas(cur)
-        kegiatan_ids = seed_kegiatan(cur)
-        tanaman_map = seed_tanaman(cur, taman_ids)
-        seed_laporan(cur, tanaman_map, petugas_ids, kegiatan_ids, args.laporan_per_tanaman)
+        # Skip per-row FK lookups during the load. MySQL does NOT re-check them
+        # later, which is fine here: every FK value comes from ids we just read back.
+        cur.execute("SET SESSION foreign_key_checks=0")
+        try:
+            # Seed in FK-safe order
+            taman_ids = seed_taman(cur)
+            petugas_ids = seed_petugas(pcur)
+            kegiatan_ids = seed_kegiatan(pcur)
+            tanaman_map = seed_tanaman(pcur, taman_ids)
+            seed_laporan(cur, tanaman_map, petugas_ids, kegiatan_ids, args.laporan_per_tanaman)
+        finally:
+            cur.execute("SET SESSION foreign_key_checks=1")
 
         conn.commit()
         print("[OK] Seeding completed.")
-        print(f" - Taman: {len(taman_ids)} (existing+new)")
-        print(f" - Petugas: {len(petugas_ids)} (existing+new)")
-        print(f" - Kegiatan: {len(kegiatan_ids)} (existing+new)")
-        print(f" - Tanaman: {len(tanaman_map)} total rows now")
+        print(f" - Taman: {len(taman_ids)} (inserted or updated)")
+        print(f" - Petugas: {len(petugas_ids)} (new)")
+        print(f" - Kegiatan: {len(kegiatan_ids)} (new)")
+        print(f" - Tanaman: {len(tanaman_map)} (new)")
     except Exception as e:
         conn.rollback()
         raise
     finally:
-        conn.close()
+        try:
+            if dropped:
+                restore_indexes(conn.cursor(), "laporan", dropped)
+        finally:
+            conn.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+# wsgi.py
+"""
+WSGI entry point for running the MySQL-backed API under a production server.
+
+    gunicorn -w 4 -k gthread --threads 8 --keep-alive 5 -b 0.0.0.0:5000 wsgi:application
+    # or, on Windows:
+    waitress-serve --port=5000 wsgi:application
+"""
+from app import app
+
+application = app